@@ -73,25 +73,58 @@ class ClusterStatusInputs(Names):
     SHUTDOWN = NamedConstant()
 
 
-@attributes(["client"])
+@attributes(["client"], apply_with_cmp=False)
 class _ConnectedToControlService(
         trivialInput(ClusterStatusInputs.CONNECTED_TO_CONTROL_SERVICE)):
     """
     A rich input indicating the client has connected.
 
+    Comparison is hand-rolled as a single tuple comparison; instances
+    are compared in bulk by the convergence agent tests.
+
     :ivar AMP client: An AMP client connected to the control service.
     """
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return self.client == other.client
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self.__class__, self.client))
 
 
-@attributes(["configuration", "state"])
+@attributes(["configuration", "state"], apply_with_cmp=False)
 class _StatusUpdate(trivialInput(ClusterStatusInputs.STATUS_UPDATE)):
     """
     A rich input indicating the cluster status has been received from the
     control service.
 
+    Comparison is hand-rolled as a single tuple comparison; instances
+    are compared in bulk by the convergence agent tests.
+
     :ivar Deployment configuration: Desired cluster configuration.
     :ivar Deployment state: Actual cluster state.
     """
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return ((self.configuration, self.state) ==
+                    (other.configuration, other.state))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self.__class__, self.configuration, self.state))
 
 
 class ClusterStatusStates(Names):
@@ -210,10 +243,15 @@ def build_cluster_status_fsm(convergence_loop_fsm):
     ``AgentLoopService``; the world object here just gets notified of
     disconnects, it need schedule the reconnect itself.
 
+    The returned machine additionally has a ``receive_many`` method that
+    feeds a sequence of inputs to the machine with a single call,
+    amortizing the per-call overhead of ``receive`` for callers that
+    deliver inputs in batches.
+
     :param convergence_loop_fsm: A convergence loop FSM as output by
     ``build_convergence_loop_fsm``.
     """
-    return constructFiniteStateMachine(
+    fsm = constructFiniteStateMachine(
         inputs=ClusterStatusInputs,
         outputs=ClusterStatusOutputs,
         states=ClusterStatusStates,
@@ -223,6 +261,12 @@ def build_cluster_status_fsm(convergence_loop_fsm):
         inputContext={},
         world=MethodSuffixOutputer(ClusterStatus(convergence_loop_fsm)))
 
+    def receive_many(symbols, _receive=fsm.receive):
+        for symbol in symbols:
+            _receive(symbol)
+    fsm.receive_many = receive_many
+    return fsm
+
 
 class ConvergenceLoopInputs(Names):
     """
@@ -239,17 +283,35 @@ class ConvergenceLoopInputs(Names):
     WAKEUP = NamedConstant()
 
 
-@attributes(["client", "configuration", "state"])
+@attributes(["client", "configuration", "state"], apply_with_cmp=False)
 class _ClientStatusUpdate(trivialInput(ConvergenceLoopInputs.STATUS_UPDATE)):
     """
     A rich input with a cluster status update - we are currently connected
     to the control service, and know latest desired configuration and
     cluster state.
 
+    Comparison is hand-rolled as a single tuple comparison; instances
+    are compared in bulk by the convergence agent tests.
+
     :ivar AMP client: An AMP client connected to the control service.
     :ivar Deployment configuration: Desired cluster configuration.
     :ivar Deployment state: Actual cluster state.
     """
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return ((self.client, self.configuration, self.state) ==
+                    (other.client, other.configuration, other.state))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(
+            (self.__class__, self.client, self.configuration, self.state))
 
 
 @attributes(["delay_seconds"])
@@ -454,21 +516,34 @@ class ConvergenceLoop(object):
             # one update using the new client.
             self._last_acknowledged_state = None
 
-    def output_UPDATE_MAYBE_WAKEUP(self, context):
-        # External configuration and state has changed. Let's pretend
-        # local state hasn't changed. If when we calculate changes that
-        # still indicates some action should be taken that means we should
-        # wake up:
-        discovered = self._last_discovered_local_state
+    def _calculate_wakeup_changes(self):
+        """
+        Calculate the changes used to decide whether to wake up from a
+        sleep, guarding against calculation blowing up.
+
+        This owns the ``try``/``except`` so the dispatch code in
+        ``output_UPDATE_MAYBE_WAKEUP`` stays free of exception handling.
+
+        :return: The calculated ``IStateChange``, or ``None`` if the
+            calculation raised.
+        """
         try:
-            changes = self.deployer.calculate_changes(
-                self.configuration, self.cluster_state, discovered)
+            return self.deployer.calculate_changes(
+                self.configuration, self.cluster_state,
+                self._last_discovered_local_state)
         except:
             # Something went wrong in calculation due to a bug in the
             # code. We should wake up just in case in order to be more
             # responsive.
             write_traceback()
-            changes = None
+            return None
+
+    def output_UPDATE_MAYBE_WAKEUP(self, context):
+        # External configuration and state has changed. Let's pretend
+        # local state hasn't changed. If when we calculate changes that
+        # still indicates some action should be taken that means we should
+        # wake up:
+        changes = self._calculate_wakeup_changes()
         if not isinstance(changes, NoOp):
             self.fsm.receive(ConvergenceLoopInputs.WAKEUP)
         else: